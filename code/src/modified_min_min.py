@@ -1,31 +1,85 @@
-import json
+import heapq
 from collections import defaultdict
 
+import numpy as np
+
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional, the standard library parser gives the same data
+    import json as _json
+
+
+def _est_kernel(same_server, pred_vms, pred_finish, pred_comm):
+    """Reduce predecessor arrival times to an Earliest Start Time per VM"""
+    if not len(pred_vms):
+        return np.zeros(len(same_server), dtype=pred_finish.dtype)
+        
+    # Communication time is 0 if same cloud server
+    arrival = pred_finish[:, None] + np.where(same_server[pred_vms], 0, pred_comm[:, None])
+    return arrival.max(axis=0)
+
+
 class WorkflowScheduler:
     def __init__(self):
         self.tasks = []
         self.cloud_servers = []
         self.ect_table = {}  # Execution time table: {task: {vm: time}}
-        self.priority_queue = []
-        self.task_allocation = defaultdict(list)  # {vm: [task1, task2,...]}
+        self.vms_list = []  # All VMs in server order
+        self.task_idx = {}  # {task: row in self.ect}
+        self.vm_idx = {}  # {vm: column in self.ect}
+        self.vm_server_id = {}  # {vm: server prefix of the VM name}
+        self.vm_server = np.zeros(0, dtype=np.int64)  # Index of each VM's server prefix
+        self.same_server = np.zeros((0, 0), dtype=bool)  # [vm, vm]: True if both VMs share a server
+        self.ect = np.zeros((0, 0))  # Dense ECT matrix: [task, vm]
+        self.time_dtype = np.int64  # int64 when all ECT and communication times are ints, else float64
+        self.row_min_ect = np.zeros(0)  # Minimum ECT of each task over all VMs
+        self.alloc_by_vm = []  # Task indices allocated to each VM index
+        self.vm_order = []  # VM indices in the order they received their first task
+        self.assigned_vm = np.zeros(0, dtype=np.int64)  # VM index of each non-entry task, -1 if unallocated
+        self.assigned_ect = np.zeros(0)  # ECT of each non-entry task on its VM
+        self.vm_load = None  # Total ECT allocated to each VM, computed on first use after allocation
+        self.task_to_vm = {}  # {task: vm}
         self.est_values = {}  # Earliest start times
         self.eft_values = {}  # Earliest finish times
+        self.task_eft = {}  # {task: EFT on the VM in task_to_vm}
+        self.entry_efts = {}  # {vm: EFT of the entry task copy}; entry copies all start at 0
         self.entry_task = None
         self.exit_task = None
         self.task_dependencies = {}  # {task: [prerequisites]}
-        self.communication_times = {}  # {(task1, task2): time}
+        self.successors = {}  # {task: [dependent tasks]}
+        self.communication_times = {}  # {task1: {task2: time}}
+        
+    @property
+    def task_allocation(self):
+        """Task allocation by name: {vm: [task1, task2,...]}"""
+        return {self.vms_list[vi]: [self.tasks[ti] for ti in self.alloc_by_vm[vi]] for vi in self.vm_order}
         
     def load_input(self, input_file):
         """Load input from JSON file"""
-        with open(input_file) as f:
-            data = json.load(f)
+        with open(input_file, 'rb') as f:
+            data = _json.loads(f.read())
             
+        # Clear the schedule of any previous run
+        self.est_values = {}
+        self.eft_values = {}
+        self.task_to_vm = {}
+        self.task_eft = {}
+        self.entry_efts = {}
+        self.vm_load = None
+        
         # Load tasks and identify entry/exit tasks
         self.tasks = data['tasks']
         self.entry_task = data['entry_task']
         self.exit_task = data['exit_task']
         self.task_dependencies = data['dependencies']
-        self.communication_times = {tuple(pair.split('-')): time for pair, time in data['communication_times'].items()}
+        self.successors = defaultdict(list)
+        for task, deps in self.task_dependencies.items():
+            for dep in deps:
+                self.successors[dep].append(task)
+        self.communication_times = defaultdict(dict)
+        for pair, time in data['communication_times'].items():
+            pred, succ = pair.split('-', 1)
+            self.communication_times[pred][succ] = time
         
         # Load cloud servers and VMs
         self.cloud_servers = data['cloud_servers']
@@ -33,27 +87,55 @@ class WorkflowScheduler:
         # Load ECT table
         self.ect_table = data['ect_table']
         
+        # Index tasks and VMs into a dense ECT matrix for the scheduling loops
+        self.vms_list = [vm for server in self.cloud_servers for vm in server['vms']]
+        self.task_idx = {task: i for i, task in enumerate(self.tasks)}
+        self.vm_idx = {vm: i for i, vm in enumerate(self.vms_list)}
+        self.alloc_by_vm = [[] for _ in self.vms_list]
+        self.vm_order = []
+        self.assigned_vm = np.full(len(self.tasks), -1, dtype=np.int64)
+        # VMs share a cloud server when their names share the prefix before '_'
+        self.vm_server_id = {vm: vm.split('_', 1)[0] for vm in self.vms_list}
+        server_idx = {}
+        self.vm_server = np.array([server_idx.setdefault(self.vm_server_id[vm], len(server_idx))
+                                   for vm in self.vms_list], dtype=np.int64)
+        self.same_server = self.vm_server[:, None] == self.vm_server[None, :]
+        ect_rows = [[self.ect_table[task][vm] for vm in self.vms_list] for task in self.tasks]
+        
+        # Keep integer inputs integral so EST/EFT values and the makespan stay ints
+        integral = all(type(time) is int for row in ect_rows for time in row) and \
+            all(type(time) is int for times in self.communication_times.values() for time in times.values())
+        self.time_dtype = np.int64 if integral else np.float64
+        ect = np.array(ect_rows, dtype=self.time_dtype).reshape(len(self.tasks), len(self.vms_list))
+        
+        # Store ECTs as int32/float32 when no value changes; start and finish times still accumulate in 64 bits
+        narrow = ect.astype(np.int32 if integral else np.float32)
+        self.ect = narrow if np.array_equal(narrow, ect) else ect
+        self.assigned_ect = np.zeros(len(self.tasks), dtype=self.time_dtype)
+        self.row_min_ect = self.ect.min(axis=1)
+        
     def save_output(self, output_file, makespan, load_balancing, speedup, efficiency, resource_utilization):
         """Save results to a plain text file"""
+        parts = ["Task Allocation:\n"]
+        parts.extend("  %s: %s\n" % (vm, tasks) for vm, tasks in self.task_allocation.items())
+        
+        parts.append("\nEarliest Start Times (EST):\n")
+        parts.extend("  %s on %s: %s\n" % (self.entry_task, vm, 0) for vm in self.entry_efts)
+        parts.extend("  %s on %s: %s\n" % (task, vm, time) for (task, vm), time in self.est_values.items())
+        
+        parts.append("\nEarliest Finish Times (EFT):\n")
+        parts.extend("  %s on %s: %s\n" % (self.entry_task, vm, time) for vm, time in self.entry_efts.items())
+        parts.extend("  %s on %s: %s\n" % (task, vm, time) for (task, vm), time in self.eft_values.items())
+        
+        parts.append("\nPerformance Metrics:\n")
+        parts.append(f"  Makespan: {makespan}\n")
+        parts.append(f"  Load Balancing: {load_balancing}\n")
+        parts.append(f"  Speedup: {speedup}\n")
+        parts.append(f"  Efficiency: {efficiency}%\n")
+        parts.append(f"  Resource Utilization: {resource_utilization}\n")
+        
         with open(output_file, 'w') as f:
-            f.write("Task Allocation:\n")
-            for vm, tasks in self.task_allocation.items():
-                f.write(f"  {vm}: {tasks}\n")
-            
-            f.write("\nEarliest Start Times (EST):\n")
-            for (task, vm), time in self.est_values.items():
-                f.write(f"  {task} on {vm}: {time}\n")
-            
-            f.write("\nEarliest Finish Times (EFT):\n")
-            for (task, vm), time in self.eft_values.items():
-                f.write(f"  {task} on {vm}: {time}\n")
-            
-            f.write("\nPerformance Metrics:\n")
-            f.write(f"  Makespan: {makespan}\n")
-            f.write(f"  Load Balancing: {load_balancing}\n")
-            f.write(f"  Speedup: {speedup}\n")
-            f.write(f"  Efficiency: {efficiency}%\n")
-            f.write(f"  Resource Utilization: {resource_utilization}\n")
+            f.write(''.join(parts))
         
 
     def satisfies_precedence_constraints(self, task, allocated_tasks):
@@ -66,102 +148,104 @@ class WorkflowScheduler:
                 return False
         return True
     
-    def calculate_priority(self, remaining_tasks, allocated_tasks):
-        """Calculate priority for each task based on Min-Min heuristic"""
-        min_times = {}
-        
-        for task in remaining_tasks:
-            if not self.satisfies_precedence_constraints(task, allocated_tasks):
-                continue
-                
-            min_time = min(self.ect_table[task].values())
-            min_times[task] = min_time
-            
-        if not min_times:
-            return None
-            
-        # Select task with minimum min_time
-        selected_task = min(min_times.items(), key=lambda x: x[1])[0]
-        return selected_task
-    
     def update_ect_values(self, task, vm, time):
         """Update ECT values after task allocation"""
         # In the Min-Min heuristic, we add the execution time to other tasks on the same VM
-        for t in self.ect_table:
-            if t != task and vm in self.ect_table[t]:
-                self.ect_table[t][vm] += time
+        ect_table = self.ect_table
+        for t, times in ect_table.items():
+            if t != task and vm in times:
+                times[vm] += time
     
-    def calculate_est(self, task, vm):
-        """Calculate Earliest Start Time for a task on a VM"""
+    def _est_vector(self, task):
+        """Calculate Earliest Start Time for a task on every VM"""
         if task == self.entry_task:
-            return 0
+            return np.zeros(len(self.vms_list), dtype=self.time_dtype)
             
-        max_time = 0
+        pred_vms, pred_finish, pred_comm = [], [], []
         for pred in self.task_dependencies.get(task, []):
             # Find when predecessor finished on its VM
-            pred_vm = None
-            for v, tasks in self.task_allocation.items():
-                if pred in tasks:
-                    pred_vm = v
-                    break
-                    
+            pred_vm = self.task_to_vm.get(pred)
             if pred_vm is None:
                 continue
                 
-            # Communication time is 0 if same cloud server
-            comm_time = 0 if vm.split('_')[0] == pred_vm.split('_')[0] else \
-                self.communication_times.get((pred, task), 0)
-                
-            finish_time = self.eft_values.get((pred, pred_vm), 0)
-            total_time = finish_time + comm_time
-            if total_time > max_time:
-                max_time = total_time
-                
-        return max_time
+            pred_vms.append(self.vm_idx[pred_vm])
+            pred_finish.append(self.task_eft.get(pred, 0))
+            pred_comm.append(self.communication_times.get(pred, {}).get(task, 0))
+            
+        return _est_kernel(self.same_server, np.array(pred_vms, dtype=np.int64),
+                           np.array(pred_finish, dtype=self.time_dtype),
+                           np.array(pred_comm, dtype=self.time_dtype))
+    
+    def calculate_est(self, task, vm):
+        """Calculate Earliest Start Time for a task on a VM"""
+        return self._est_vector(task)[self.vm_idx[vm]].item()
     
     def calculate_eft(self, task, vm):
         """Calculate Earliest Finish Time for a task on a VM"""
         est = self.calculate_est(task, vm)
         return est + self.ect_table[task][vm]
     
+    def _append_allocation(self, vi, ti):
+        """Record task index ti on VM index vi"""
+        if not self.alloc_by_vm[vi]:
+            self.vm_order.append(vi)
+        self.alloc_by_vm[vi].append(ti)
+    
     def allocate_task(self, task):
         """Allocate task to best VM"""
+        self.vm_load = None
         if task == self.entry_task:
             # Duplicate entry task to all VMs
-            for server in self.cloud_servers:
-                for vm in server['vms']:
-                    self.est_values[(task, vm)] = 0
-                    self.eft_values[(task, vm)] = self.ect_table[task][vm]
-                    self.task_allocation[vm].append(task)
-                    # No need to update ECT for duplicates
+            ti = self.task_idx[task]
+            for vi, vm in enumerate(self.vms_list):
+                self.entry_efts[vm] = self.ect_table[task][vm]
+                self._append_allocation(vi, ti)
+                # No need to update ECT for duplicates
+            # Successors read the entry task from the first VM holding a copy
+            self.task_to_vm[task] = self.vms_list[self.vm_order[0]]
+            self.task_eft[task] = self.entry_efts[self.task_to_vm[task]]
             return
             
         # For other tasks, find VM with minimum EFT
-        best_vm = None
-        min_eft = float('inf')
-        best_est = 0
-        
-        for server in self.cloud_servers:
-            for vm in server['vms']:
-                est = self.calculate_est(task, vm)
-                eft = est + self.ect_table[task][vm]
-                if eft < min_eft:
-                    min_eft = eft
-                    best_est = est
-                    best_vm = vm
-                    
-        if best_vm is None:
+        if not self.vms_list:
             return
             
+        ti = self.task_idx[task]
+        est_vec = self._est_vector(task)
+        eft_vec = est_vec + self.ect[ti]
+        best = int(eft_vec.argmin())
+        best_vm = self.vms_list[best]
+            
         # est = self.calculate_est(task, best_vm)
-        self.est_values[(task, best_vm)] = best_est
-        self.eft_values[(task, best_vm)] = min_eft
-        self.task_allocation[best_vm].append(task)
+        self.est_values[(task, best_vm)] = est_vec[best].item()
+        self.eft_values[(task, best_vm)] = eft_vec[best].item()
+        self._append_allocation(best, ti)
+        self.assigned_vm[ti] = best
+        self.assigned_ect[ti] = self.ect[ti, best]
+        self.task_to_vm[task] = best_vm
+        self.task_eft[task] = eft_vec[best].item()
         # self.update_ect_values(task, best_vm, self.ect_table[task][best_vm])
     
+    def _compute_vm_load(self):
+        """Sum the ECT of the tasks allocated to each VM"""
+        allocated = self.assigned_vm >= 0
+        vm_load = np.bincount(self.assigned_vm[allocated], weights=self.assigned_ect[allocated],
+                              minlength=len(self.vms_list))
+        # The entry task runs on every VM
+        if self.entry_task in self.task_to_vm:
+            vm_load += self.ect[self.task_idx[self.entry_task]]
+        return vm_load
+    
+    def _used_vm_loads(self):
+        """Loads of the VMs that received tasks"""
+        if self.vm_load is None:
+            self.vm_load = self._compute_vm_load()
+        return self.vm_load[self.vm_order]
+    
     def calculate_makespan(self):
         """Calculate makespan (maximum finish time)"""
-        return max(self.eft_values.values(), default=0)
+        # Every copy of the entry task counts, not only the one successors read
+        return max(max(self.task_eft.values(), default=0), max(self.entry_efts.values(), default=0))
     
     # def calculate_load_balancing(self, makespan):
     #     """Calculate load balancing metric"""
@@ -178,18 +262,14 @@ class WorkflowScheduler:
     
     def calculate_load_balancing(self,makespan=None):
     # """Load Balancing = (average load / maximum load) * 100"""
-        if not self.task_allocation:
+        vm_loads = self._used_vm_loads()
+        if not len(vm_loads):
             return 0
 
-        vm_loads = []
-        for vm, tasks in self.task_allocation.items():
-            vm_load = sum(self.ect_table[task][vm] for task in tasks)
-            vm_loads.append(vm_load)
-
-        avg_load = sum(vm_loads) / len(vm_loads)
-        max_load = max(vm_loads, default=1)
+        avg_load = vm_loads.mean()
+        max_load = vm_loads.max()
 
-        return (avg_load / max_load) * 100
+        return float(avg_load / max_load) * 100
 
     
     def calculate_speedup(self, makespan):
@@ -197,7 +277,7 @@ class WorkflowScheduler:
         if not makespan:
             return 0
             
-        sequential_time = sum(min(self.ect_table[task].values()) for task in self.tasks)
+        sequential_time = float(self.row_min_ect.sum(dtype=np.float64))
         return sequential_time / makespan if makespan else 0
     
     def calculate_efficiency(self, speedup):
@@ -210,12 +290,9 @@ class WorkflowScheduler:
         if not makespan:
             return 0
 
-        total_utilization = 0
-        num_vms = len(self.task_allocation)
-
-        for vm, tasks in self.task_allocation.items():
-            for task in tasks:
-                total_utilization += self.ect_table[task][vm]
+        vm_loads = self._used_vm_loads()
+        total_utilization = float(vm_loads.sum())
+        num_vms = len(vm_loads)
 
         utilization = (total_utilization / (makespan * num_vms)) * 100
         return utilization
@@ -241,28 +318,30 @@ class WorkflowScheduler:
         # Load input data
         self.load_input(input_file)
         
-        # Phase I: Task selection
-        remaining_tasks = set(self.tasks)
-        allocated_tasks = set()
+        # Task selection and allocation in a single pass
+        # ECT values are not updated between selections, so priorities are computed once
+        # and each ready task is allocated as soon as it has the highest priority
+        priorities = self.row_min_ect.tolist()
         
-        while remaining_tasks:
+        # Count unallocated predecessors; a task is ready once its count reaches 0
+        pending = {task: 0 if task == self.entry_task else len(self.task_dependencies.get(task, []))
+                   for task in self.tasks}
+        ready = [(priorities[i], i) for i, task in enumerate(self.tasks) if pending[task] == 0]
+        heapq.heapify(ready)
+        
+        while ready:
             # Select task with highest priority
-            task = self.calculate_priority(remaining_tasks, allocated_tasks)
-            if task is None:
-                break
-                
-            self.priority_queue.append(task)
-            remaining_tasks.remove(task)
-            allocated_tasks.add(task)
-            
-            # Update ECT values (simplified for this example)
-            # In a real implementation, we'd update based on the selected VM
-            
-        # Phase II: Resource selection and task allocation
-        while self.priority_queue:
-            task = self.priority_queue.pop(0)
+            _, ti = heapq.heappop(ready)
+            task = self.tasks[ti]
             self.allocate_task(task)
             
+            for succ in self.successors.get(task, []):
+                if succ not in pending:
+                    continue
+                pending[succ] -= 1
+                if pending[succ] == 0:
+                    heapq.heappush(ready, (priorities[self.task_idx[succ]], self.task_idx[succ]))
+            
         # Calculate QoS parameters
         makespan = self.calculate_makespan()
         load_balancing = self.calculate_load_balancing(makespan)
@@ -56,7 +56,10 @@ def test_scheduler_correctness(input_filename, scheduler):
             dep_vm = next((vm for vm, t_list in scheduler.task_allocation.items() if dep in t_list), None)
 
             task_est = scheduler.est_values.get((task, task_vm), 0)
-            dep_eft = scheduler.eft_values.get((dep, dep_vm), 0)
+            if dep == input_data["entry_task"]:
+                dep_eft = scheduler.entry_efts[dep_vm]
+            else:
+                dep_eft = scheduler.eft_values.get((dep, dep_vm), 0)
 
             comm_key = f"{dep}-{task}"
             comm_time = 0 if dep_vm.split('_')[0] == task_vm.split('_')[0] else \
@@ -72,7 +75,35 @@ def test_scheduler_correctness(input_filename, scheduler):
         ect = input_data["ect_table"][task][vm]
         assert eft == est + ect, f"EFT inconsistency: {task} on {vm}, EST={est}, ECT={ect}, EFT={eft}"
 
+    # Entry task copies all start at 0, so EFT = ECT
+    for vm, eft in scheduler.entry_efts.items():
+        ect = input_data["ect_table"][input_data["entry_task"]][vm]
+        assert eft == ect, f"EFT inconsistency: entry task on {vm}, ECT={ect}, EFT={eft}"
+
     with open(output_file, 'a') as f:
         f.write(f"\nEmpirical Time: {empirical_time:.4f} seconds\n")
 
     print(f"Empirical Time for {input_filename}: {empirical_time:.4f} seconds")
+
+def test_scheduler_reuse(scheduler):
+    first_input = os.path.join(INPUT_DIR, "input.json")
+    second_input = os.path.join(INPUT_DIR, "input2.json")
+
+    scheduler.schedule_workflow(first_input, os.path.join(OUTPUT_DIR, "reuse_first_output.txt"))
+    results = scheduler.schedule_workflow(second_input, os.path.join(OUTPUT_DIR, "reuse_second_output.txt"))
+
+    fresh = WorkflowScheduler()
+    fresh_results = fresh.schedule_workflow(second_input, os.path.join(OUTPUT_DIR, "reuse_fresh_output.txt"))
+
+    assert results == fresh_results, "Results must not depend on an earlier run"
+    assert dict(scheduler.task_allocation) == dict(fresh.task_allocation), "Allocation leaked from an earlier run"
+
+def test_metrics_after_manual_allocation(scheduler):
+    scheduler.schedule_workflow(os.path.join(INPUT_DIR, "input2.json"), os.path.join(OUTPUT_DIR, "manual_output.txt"))
+
+    # Only the entry task, duplicated on every VM: loads 14, 16 and 9
+    scheduler.load_input(os.path.join(INPUT_DIR, "input.json"))
+    scheduler.allocate_task(scheduler.entry_task)
+
+    assert scheduler.calculate_load_balancing() == pytest.approx(13 / 16 * 100)
+    assert scheduler.calculate_resource_utilization(16) == pytest.approx(39 / (16 * 3) * 100)